@@ -1,21 +1,36 @@
+import asyncio
+from contextlib import asynccontextmanager
 from pathlib import Path
+
+import orjson
 from fastapi.staticfiles import StaticFiles
 
-from .probe import scan_once
+from .probe import close_http_client, scan_once_async
 from .rules import apply_rules
 
-from fastapi import FastAPI, HTTPException, Response
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 # Import our schemas and loader
 from .models import ChecksConfig, RulesConfig
-from .utils import load_and_validate
+from .utils import load_and_validate, load_and_validate_with_etag
 
 FRONTEND_DIST = (Path(__file__).resolve().parents[2] / "frontend" / "dist")
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # release the probe client's pooled connections on shutdown
+    await close_http_client()
+
+
+# orjson encodes the nested snapshot dicts much faster than stdlib json
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
 
+# Keep each origin as its own comma-terminated entry: adjacent string
+# literals silently concatenate into one bogus origin and CORS never matches.
 ALLOWED_ORIGINS = [
     "http://localhost:5173",
     "http://127.0.0.1:5173",
@@ -30,61 +45,80 @@ app.add_middleware(
 )
 
 @app.get("/favicon.ico", include_in_schema=False)
-def favicon():
+async def favicon():
     return Response(status_code=204)
 
 @app.get("/api/health")
-def health():
+async def health():
     return {"status": "ok"}
 
 
+def _config_response(request: Request, rel_path: str, model) -> Response:
+    """
+    Serve a validated config with an ETag from the loader's stat; a matching
+    If-None-Match gets a bodyless 304 with no JSON encoding at all.
+    """
+    cfg, etag = load_and_validate_with_etag(rel_path, model)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return ORJSONResponse(cfg.model_dump(mode="json"), headers={"ETag": etag})
+
+
 @app.get("/api/configs/checks")
-def get_checks_config():
+async def get_checks_config(request: Request):
     """
     Load backend/configs/checks.yaml, validate against ChecksConfig,
     and return the validated data (as JSON).
     """
     try:
-        cfg = load_and_validate("checks.yaml", ChecksConfig)
-        return cfg.model_dump()  # serialize Pydantic model -> dict -> JSON
+        return _config_response(request, "checks.yaml", ChecksConfig)
     except (FileNotFoundError, ValueError) as e:
         # 500 because it’s a server/config error, not a client request issue
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/configs/rules")
-def get_rules_config():
+async def get_rules_config(request: Request):
     """
     Load backend/configs/rules.yaml, validate against RulesConfig,
     and return the validated data (as JSON).
     """
     try:
-        cfg = load_and_validate("rules.yaml", RulesConfig)
-        return cfg.model_dump()
+        return _config_response(request, "rules.yaml", RulesConfig)
     except (FileNotFoundError, ValueError) as e:
         raise HTTPException(status_code=500, detail=str(e))
     
     # dev-only scan endpoint to exercise Step 4
 @app.get("/api/scan")
-def api_scan():
+async def api_scan():
     """
     Run a single local scan and return the raw snapshot.
     (Rule engine will consume this in Step 5.)
     """
     try:
-        return scan_once()
+        snapshot = await scan_once_async()
+        # encode in a worker thread so a big snapshot doesn't stall the loop
+        payload = await asyncio.to_thread(orjson.dumps, snapshot)
+        return Response(content=payload, media_type="application/json")
     except Exception as e:
         # Surface failures clearly
         raise HTTPException(status_code=500, detail=str(e))
-    
+
 
 @app.post("/api/scan")
-def scan_and_analyze():
-    snapshot = scan_once()
-    rules = load_and_validate("rules.yaml", RulesConfig)
-    findings = apply_rules(snapshot, rules)
-    return {"snapshot": snapshot, "findings": findings}
+async def scan_and_analyze():
+    snapshot = await scan_once_async()
+
+    def _analyze_and_encode() -> bytes:
+        # rule matching + JSON encoding are CPU-bound; keep both off the loop
+        rules = load_and_validate("rules.yaml", RulesConfig)
+        findings = apply_rules(snapshot, rules)
+        return orjson.dumps({"snapshot": snapshot, "findings": findings})
+
+    payload = await asyncio.to_thread(_analyze_and_encode)
+    return Response(content=payload, media_type="application/json")
 
-    #uvicorn backend.app.main:app --reload
+    # dev:  uvicorn backend.app.main:app --reload
+    # prod: uvicorn backend.app.main:app --workers $(nproc) --loop uvloop --http httptools --no-access-log
 
 
 
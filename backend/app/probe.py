@@ -1,18 +1,21 @@
 # backend/app/probe.py
 from __future__ import annotations
 
+import asyncio
+import errno
+import functools
 import platform
 import os
 import re
+import selectors
 import socket
+import struct
 import subprocess
 import time
-from dataclasses import asdict, dataclass
-from datetime import datetime
+from dataclasses import dataclass
 from typing import Literal, Optional
 
-import requests
-from requests.exceptions import RequestException
+import httpx
 
 from .models import ChecksConfig, PortCheck, Protocol
 from .utils import load_and_validate
@@ -20,15 +23,47 @@ from .utils import load_and_validate
 
 # ---------- gateway discovery ----------
 
+def _gateway_from_proc() -> Optional[str]:
+    """
+    Parse /proc/net/route for the default route's gateway (Linux only).
+    The Gateway column is little-endian hex; no subprocess needed.
+    """
+    try:
+        with open("/proc/net/route", encoding="ascii") as f:
+            next(f)  # skip header row
+            for line in f:
+                fields = line.split()
+                if len(fields) < 3 or fields[1] != "00000000":
+                    continue
+                gw = int(fields[2], 16)
+                if gw:
+                    return socket.inet_ntoa(struct.pack("<L", gw))
+    except (OSError, ValueError, StopIteration):
+        pass
+    return None
+
+
+@functools.lru_cache(maxsize=1)
 def find_default_gateway() -> str:
     """
     Return the default gateway (router) IPv4 address as a string.
     Cross-platform, no admin required.
+
+    Cached for the process lifetime: the gateway essentially never changes
+    while we're running, and the subprocess+regex discovery costs tens of
+    ms per call. Failures aren't cached, so a scan before the network is
+    up will retry. Clear with find_default_gateway.cache_clear().
     """
     system = platform.system().lower()
 
     try:
         if "linux" in system:
+            # Fast path: the kernel already exposes the routing table as a
+            # file, so skip the fork/exec + text parsing of `ip route`.
+            gw = _gateway_from_proc()
+            if gw:
+                return gw
+
             out = subprocess.check_output(["ip", "route"], text=True, stderr=subprocess.DEVNULL)
             m = re.search(r"default\s+via\s+(\d+\.\d+\.\d+\.\d+)", out)
             if m:
@@ -59,6 +94,7 @@ def find_default_gateway() -> str:
 class HTTPProbe:
     status: Optional[int] = None
     headers: Optional[str] = None
+    headers_map: Optional[dict[str, str]] = None
     body_snippet: Optional[str] = None
 
 @dataclass
@@ -74,6 +110,21 @@ class CheckResult:
 
 # ---------- low-level probes ----------
 
+# Shared async client so probes reuse pooled TCP (and TLS) connections —
+# with HTTP/2, concurrent probes to the same target multiplex over one
+# connection. Routers use self-signed certs, so verify=False.
+_HTTPX = httpx.AsyncClient(
+    http2=True,
+    verify=False,
+    limits=httpx.Limits(max_keepalive_connections=8, max_connections=16),
+    timeout=1.5,
+)
+
+
+async def close_http_client() -> None:
+    """Close the shared client; called from the app's lifespan shutdown."""
+    await _HTTPX.aclose()
+
 def tcp_connect(host: str, port: int, timeout_s: float = 1.0) -> Literal["open", "closed", "timeout"]:
     """
     Attempt a single TCP connect; no retries, short timeout.
@@ -97,81 +148,241 @@ def tcp_connect(host: str, port: int, timeout_s: float = 1.0) -> Literal["open",
             pass
 
 
-def http_fetch(scheme: str, host: str, port: int, timeout_s: float = 1.5) -> HTTPProbe:
+# connect_ex codes that mean "handshake still in flight" on a non-blocking socket
+_CONNECT_IN_PROGRESS = {
+    errno.EINPROGRESS,
+    errno.EWOULDBLOCK,
+    errno.EAGAIN,
+    getattr(errno, "WSAEWOULDBLOCK", errno.EWOULDBLOCK),  # Windows
+}
+
+
+def tcp_connect_batch(host: str, ports: list[int], timeout_s: float = 1.0) -> dict[int, Literal["open", "closed", "timeout"]]:
+    """
+    Probe many ports at once: non-blocking connects multiplexed through one
+    selector, so the whole batch shares a single timeout window instead of
+    blocking a thread per port.
+    """
+    results: dict[int, Literal["open", "closed", "timeout"]] = {p: "timeout" for p in ports}
+    if not ports:
+        return results
+
+    sel = selectors.DefaultSelector()
+    pending = 0
+    try:
+        for port in set(ports):
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            s.setblocking(False)
+            try:
+                rc = s.connect_ex((host, port))
+            except Exception:
+                results[port] = "closed"
+                s.close()
+                continue
+            if rc == 0:
+                results[port] = "open"
+                s.close()
+            elif rc in _CONNECT_IN_PROGRESS:
+                sel.register(s, selectors.EVENT_WRITE, port)
+                pending += 1
+            else:
+                results[port] = "closed"
+                s.close()
+
+        deadline = time.monotonic() + timeout_s
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break  # leftovers keep their "timeout" default
+            for key, _ in sel.select(remaining):
+                s = key.fileobj
+                port = key.data
+                err = s.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                results[port] = "open" if err == 0 else "closed"
+                sel.unregister(s)
+                s.close()
+                pending -= 1
+    finally:
+        for key in list(sel.get_map().values()):
+            try:
+                key.fileobj.close()
+            except Exception:
+                pass
+        sel.close()
+
+    return results
+
+
+async def http_fetch(scheme: str, host: str, port: int, timeout_s: float = 1.5) -> HTTPProbe:
     """
     GET / and return status, headers (normalized), and a short body snippet.
-    For local HTTPS we don't care about certs; mark verify=False.
+    Streams so we only pull the 512 bytes we keep, not the whole admin page.
     """
     url = f"{scheme}://{host}:{port}/"
     try:
-        resp = requests.get(url, timeout=timeout_s, verify=(scheme != "https"))
-        # Normalize headers into single string "key: value" with canonical casing
-        headers_str = "\r\n".join(f"{k}: {v}" for k, v in resp.headers.items())
-        # Prefer text; fallback to bytes decode with replacement
-        try:
-            body_snippet = resp.text[:512]
-        except Exception:
-            body_snippet = resp.content.decode("utf-8", errors="replace")[:512]
+        async with _HTTPX.stream("GET", url, timeout=timeout_s) as resp:
+            # Normalize headers into single string "key: value", and keep a
+            # dict form (lower-cased keys) for cheap key lookups
+            headers_str = "\r\n".join(f"{k}: {v}" for k, v in resp.headers.items())
+            headers_map = dict(resp.headers)
+            try:
+                raw = b""
+                async for chunk in resp.aiter_bytes(512):
+                    raw += chunk
+                    if len(raw) >= 512:
+                        break
+                body_snippet = raw[:512].decode(resp.encoding or "utf-8", errors="replace")
+            except Exception:
+                body_snippet = ""
+
+            return HTTPProbe(
+                status=resp.status_code,
+                headers=headers_str,
+                headers_map=headers_map,
+                body_snippet=body_snippet,
+            )
+
+    except httpx.HTTPError as e:
+        return HTTPProbe(status=None, headers=None, body_snippet=f"(request error: {e})")
 
-        return HTTPProbe(status=resp.status_code, headers=headers_str, body_snippet=body_snippet)
 
-    except RequestException as e:
-        return HTTPProbe(status=None, headers=None, body_snippet=f"(request error: {e})")
+def _numeric_host(host: str) -> str:
+    """
+    Normalize host to an IPv4 literal so every probe's connect skips the
+    resolver; AI_NUMERICHOST makes getaddrinfo fail fast instead of doing
+    a lookup, and a TARGET_IP hostname is resolved here once per scan
+    rather than once per connect.
+    """
+    try:
+        info = socket.getaddrinfo(
+            host, None, socket.AF_INET, socket.SOCK_STREAM, 0, socket.AI_NUMERICHOST
+        )
+    except socket.gaierror:
+        info = socket.getaddrinfo(host, None, socket.AF_INET, socket.SOCK_STREAM)
+    return info[0][4][0]
 
 
 def resolve_target_ip():
-    return os.getenv("TARGET_IP") or find_default_gateway()
+    return _numeric_host(os.getenv("TARGET_IP") or find_default_gateway())
 
 # ---------- high-level scan ----------
 
-def scan_once() -> dict:
+async def _run_check(chk: PortCheck, target_ip: str) -> CheckResult:
     """
-    Load checks.yaml, discover the router IP, run probes, and return a snapshot dict.
+    Run the probe(s) for a single check and return its CheckResult.
     """
-    # 1) load config
-    checks_cfg: ChecksConfig = load_and_validate("checks.yaml", ChecksConfig)
+    t0 = time.perf_counter()
+    item = CheckResult(name=chk.name, port=chk.port, protocol=chk.protocol.value)
+
+    # Run per-protocol logic
+    if chk.protocol == Protocol.tcp:
+        item.tcp_connect = await asyncio.to_thread(tcp_connect, target_ip, chk.port)
+
+    elif chk.protocol in (Protocol.http, Protocol.https):
+        # First: TCP connectivity (optional but helpful context)
+        tcp_state = await asyncio.to_thread(tcp_connect, target_ip, chk.port)
+        item.tcp_connect = tcp_state
+        # Then: HTTP(S) GET — but only if the port answered; a closed or
+        # filtered port would just burn the full HTTP timeout again
+        if tcp_state == "open":
+            try:
+                item.http = await http_fetch(chk.protocol.value, target_ip, chk.port)
+            except Exception as e:
+                item.error = f"http_fetch error: {e}"
+        else:
+            item.error = f"tcp {tcp_state}"
 
-    # 2) find target
-    target_ip = resolve_target_ip()
+    else:
+        item.error = f"unknown protocol: {chk.protocol.value}"
 
-    started = time.perf_counter()
-    results: list[CheckResult] = []
+    item.duration_ms = int((time.perf_counter() - t0) * 1000)
+    return item
 
-    for chk in checks_cfg.checks:
-        assert isinstance(chk, PortCheck)
-        t0 = time.perf_counter()
-        item = CheckResult(name=chk.name, port=chk.port, protocol=chk.protocol.value)
 
-        # Run per-protocol logic
-        if chk.protocol == Protocol.tcp:
-            item.tcp_connect = tcp_connect(target_ip, chk.port)
+def _run_tcp_batch(target_ip: str, checks: list[PortCheck]) -> list[CheckResult]:
+    """
+    Run all pure-TCP checks through one tcp_connect_batch call and wrap the
+    per-port states in CheckResults (config order preserved).
+    """
+    t0 = time.perf_counter()
+    states = tcp_connect_batch(target_ip, [chk.port for chk in checks])
+    elapsed_ms = int((time.perf_counter() - t0) * 1000)
+    return [
+        CheckResult(
+            name=chk.name,
+            port=chk.port,
+            protocol=chk.protocol.value,
+            tcp_connect=states[chk.port],
+            duration_ms=elapsed_ms,
+        )
+        for chk in checks
+    ]
+
+
+async def scan_once_async() -> dict:
+    """
+    Load checks.yaml, discover the router IP, run probes, and return a snapshot dict.
+    """
+    # 1) load config
+    checks_cfg: ChecksConfig = load_and_validate("checks.yaml", ChecksConfig)
 
-        elif chk.protocol in (Protocol.http, Protocol.https):
-            # First: TCP connectivity (optional but helpful context)
-            item.tcp_connect = tcp_connect(target_ip, chk.port)
-            # Then: HTTP(S) GET
-            try:
-                item.http = http_fetch(chk.protocol.value, target_ip, chk.port)
-            except Exception as e:
-                item.error = f"http_fetch error: {e}"
+    # 2) find target (first call may fork a subprocess, so off the loop)
+    target_ip = await asyncio.to_thread(resolve_target_ip)
 
-        else:
-            item.error = f"unknown protocol: {chk.protocol.value}"
+    started = time.perf_counter()
 
-        item.duration_ms = int((time.perf_counter() - t0) * 1000)
-        results.append(item)
+    # Pure-TCP checks all go through one selector-multiplexed batch (one
+    # timeout window for the lot); http/https checks run concurrently via
+    # gather. Results stay in config order because outcomes are collected
+    # in submission order.
+    tcp_checks = [(i, chk) for i, chk in enumerate(checks_cfg.checks) if chk.protocol == Protocol.tcp]
+    other_checks = [(i, chk) for i, chk in enumerate(checks_cfg.checks) if chk.protocol != Protocol.tcp]
+
+    coros = []
+    if tcp_checks:
+        coros.append(asyncio.to_thread(_run_tcp_batch, target_ip, [chk for _, chk in tcp_checks]))
+    coros.extend(_run_check(chk, target_ip) for _, chk in other_checks)
+    outcomes = await asyncio.gather(*coros) if coros else []
+
+    by_index: dict[int, CheckResult] = {}
+    if tcp_checks:
+        for (i, _), item in zip(tcp_checks, outcomes[0]):
+            by_index[i] = item
+        outcomes = outcomes[1:]
+    for (i, _), item in zip(other_checks, outcomes):
+        by_index[i] = item
+
+    results = [by_index[i] for i in range(len(checks_cfg.checks))]
 
     total_ms = int((time.perf_counter() - started) * 1000)
 
     # 3) build snapshot
     snapshot = {
         "target": target_ip,
-        "started_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        # strftime is cheaper than datetime.utcnow().isoformat(), which is
+        # also deprecated since 3.12
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
         "duration_ms": total_ms,
+        # Build dicts by hand instead of asdict(): no recursive copy, and
+        # no intermediate dicts the JSON encoder immediately re-walks
         "checks": [
             {
-                **{k: v for k, v in asdict(r).items() if k not in {"http"}},
-                "http": (asdict(r.http) if r.http else None),
+                "name": r.name,
+                "port": r.port,
+                "protocol": r.protocol,
+                "tcp_connect": r.tcp_connect,
+                "error": r.error,
+                "duration_ms": r.duration_ms,
+                "http": (
+                    {
+                        "status": r.http.status,
+                        "headers": r.http.headers,
+                        "headers_map": r.http.headers_map,
+                        "body_snippet": r.http.body_snippet,
+                    }
+                    if r.http
+                    else None
+                ),
             }
             for r in results
         ],
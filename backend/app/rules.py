@@ -1,47 +1,271 @@
 # backend/app/rules.py
 from __future__ import annotations
+import functools
 import re
-from typing import Any, Dict, List, Optional
-from .models import RulesConfig  # rules: List[Rule] with fields id, target, pattern, severity, advice
-
-def _blob_for(chk: Dict[str, Any], target: str) -> Optional[str]:
-    http = chk.get("http") or {}
-    if target == "headers":
-        return http.get("headers")
-    if target == "status":
-        s = http.get("status")
-        return str(s) if s is not None else None
-    if target == "body":
-        return http.get("body_snippet")
-    return None
+from typing import Any, Dict, List, Optional, Tuple
+from .models import RegexRule, RulesConfig  # rules: List[Rule] with fields id, target, pattern, severity, advice
+
+
+@functools.lru_cache(maxsize=512)
+def _compile(pattern: str) -> re.Pattern:
+    """
+    Compile a rule pattern once and reuse it across checks and snapshots.
+    Patterns only change when rules.yaml is edited, so the cache stays hot.
+    """
+    return re.compile(pattern)  # inline flags (?i)(?m)(?s) supported
+
+
+_LEADING_FLAGS = re.compile(r"\(\?([aiLmsux]+)\)")
+_LITERAL_PREFIX = re.compile(r"[A-Za-z-]+")
+# Backreference constructs; deliberately loose (a false positive only means
+# the rule skips fusion and is matched individually, which is always correct)
+_BACKREF = re.compile(r"\\[1-9]|\(\?P=")
+
+
+def _has_top_level_alt(pattern: str) -> bool:
+    """True if the pattern has a "|" outside any group or character class."""
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "[":
+            # Walk the class the way the engine does: a leading ] (after an
+            # optional ^) is a literal, and \] doesn't close the class
+            j = i + 1
+            if j < len(pattern) and pattern[j] == "^":
+                j += 1
+            if j < len(pattern) and pattern[j] == "]":
+                j += 1
+            while j < len(pattern) and pattern[j] != "]":
+                j += 2 if pattern[j] == "\\" else 1
+            if j >= len(pattern):
+                return True  # unterminated class: report an alt so no token is used
+            i = j + 1
+            continue
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "|" and depth == 0:
+            return True
+        i += 1
+    return False
+
+
+def _prefilter_token(pattern: str) -> Optional[str]:
+    """
+    A literal every match of the pattern must contain (lowercased), used as
+    a cheap substring prefilter before the regex engine runs. Only a plain
+    literal prefix qualifies: top-level alternation or a non-literal start
+    (lookaheads, classes, ...) returns None, meaning "always run the regex".
+    """
+    rest = pattern
+    m = _LEADING_FLAGS.match(rest)
+    while m:
+        rest = rest[m.end():]
+        m = _LEADING_FLAGS.match(rest)
+    if _has_top_level_alt(rest):
+        return None
+    if rest.startswith("^"):
+        rest = rest[1:]
+    m = _LITERAL_PREFIX.match(rest)
+    if not m:
+        return None
+    token = m.group(0)
+    # a trailing quantifier makes the last literal char optional
+    if rest[m.end():m.end() + 1] in ("?", "*", "{"):
+        token = token[:-1]
+    return token.lower() or None
+
+
+def _scoped(pattern: str) -> str:
+    """
+    Rewrite leading global inline flags ("(?i)pat" -> "(?i:pat)") so the
+    pattern can be embedded in a fused alternation; Python rejects global
+    flags that aren't at the very start of an expression.
+    """
+    flags = ""
+    m = _LEADING_FLAGS.match(pattern)
+    while m:
+        flags += m.group(1)
+        pattern = pattern[m.end():]
+        m = _LEADING_FLAGS.match(pattern)
+    if flags:
+        return f"(?{flags}:{pattern})"
+    return f"(?:{pattern})"
+
+
+def _finding(rule: RegexRule, chk_name: Optional[str], blob: str, m: re.Match) -> Dict[str, Any]:
+    return {
+        "rule_id": rule.id,
+        "check": chk_name,
+        "severity": getattr(rule.severity, "value", rule.severity),
+        "advice": rule.advice,
+        "evidence": blob[m.start():m.end()][:160],
+    }
+
+
+class _TargetMatcher:
+    """
+    All rules for one target fused into a single alternation regex: each
+    rule becomes a named group r_<idx>, so one finditer pass over the blob
+    replaces a re.search per rule.
+    """
+
+    def __init__(self, rules: List[RegexRule]):
+        self._invalid: List[Tuple[RegexRule, re.error]] = []
+        # Backreferences break under fusion: embedding shifts group numbers,
+        # so \1 / (?P=name) would point at another rule's wrapper group and
+        # the branch could never match. Such rules always match individually.
+        self._singles: Dict[str, RegexRule] = {}
+        fusable: List[Tuple[str, RegexRule]] = []
+        tokens: Dict[str, Optional[str]] = {}
+        for idx, rule in enumerate(rules):
+            try:
+                _compile(rule.pattern)
+            except re.error as e:
+                self._invalid.append((rule, e))
+                continue
+            name = f"r_{idx}"
+            tokens[name] = _prefilter_token(rule.pattern)
+            if _BACKREF.search(rule.pattern):
+                self._singles[name] = rule
+            else:
+                fusable.append((name, rule))
+        self._by_group: Dict[str, RegexRule] = dict(fusable)
+        self._tokens = tokens
+
+        self._fused: Optional[re.Pattern] = None
+        if fusable:
+            try:
+                self._fused = re.compile(
+                    "|".join(f"(?P<{name}>{_scoped(rule.pattern)})" for name, rule in fusable)
+                )
+            except re.error:
+                # Individually-valid patterns that refuse to fuse (e.g. a
+                # duplicate group name); match_into falls back to per-rule
+                # searches in that case.
+                pass
+
+    def match_into(self, blob: str, chk_name: Optional[str], findings: List[Dict[str, Any]]) -> None:
+        for rule, err in self._invalid:
+            findings.append({
+                "rule_id": getattr(rule, "id", "<invalid-regex>"),
+                "check": chk_name,
+                "severity": "warning",
+                "advice": f"Invalid regex in rules.yaml: {err}",
+                "evidence": None,
+            })
+
+        if not self._tokens:
+            return
+
+        # Cheap substring prefilter: a rule whose mandatory literal isn't in
+        # the blob can't match, so it never reaches the regex engine.
+        blob_l = blob.lower()
+        candidates = {
+            name for name, tok in self._tokens.items() if tok is None or tok in blob_l
+        }
+        if not candidates:
+            return
+
+        # Backreference rules never go through the fused pass
+        for name, rule in self._singles.items():
+            if name not in candidates:
+                continue
+            m = _compile(rule.pattern).search(blob)
+            if m:
+                findings.append(_finding(rule, chk_name, blob, m))
+
+        fused_candidates = candidates & self._by_group.keys()
+        if not fused_candidates:
+            return
+
+        if self._fused is None:
+            for name in fused_candidates:
+                rule = self._by_group[name]
+                m = _compile(rule.pattern).search(blob)
+                if m:
+                    findings.append(_finding(rule, chk_name, blob, m))
+            return
+
+        seen: set[str] = set()
+        for m in self._fused.finditer(blob):
+            name = m.lastgroup
+            if name not in self._by_group:
+                # lastgroup can be a group inside the rule's own pattern
+                name = next((g for g in self._by_group if m.group(g) is not None), None)
+                if name is None:
+                    continue
+            if name in seen:
+                continue
+            seen.add(name)
+            findings.append(_finding(self._by_group[name], chk_name, blob, m))
+            if len(seen) == len(fused_candidates):
+                break
+
+        # Alternation is leftmost-first, so a rule whose matches are all
+        # shadowed by an earlier rule can be missed by the fused pass.
+        # Recheck the stragglers individually — but only when something
+        # matched; a clean blob (no findings) stays a single scan.
+        if seen and len(seen) < len(fused_candidates):
+            for name in fused_candidates:
+                if name in seen:
+                    continue
+                rule = self._by_group[name]
+                m = _compile(rule.pattern).search(blob)
+                if m:
+                    findings.append(_finding(rule, chk_name, blob, m))
+
+
+# Fused matchers for the most recently seen rules config; rules.yaml rarely
+# changes, so a single entry is enough.
+_matchers_cache: Optional[Tuple[tuple, Dict[str, _TargetMatcher]]] = None
+
+
+def _matchers_for(rules_cfg: RulesConfig) -> Dict[str, _TargetMatcher]:
+    global _matchers_cache
+    key = tuple(
+        (
+            rule.id,
+            getattr(rule.target, "value", rule.target),
+            rule.pattern,
+            getattr(rule.severity, "value", rule.severity),
+            rule.advice,
+        )
+        for rule in rules_cfg.rules
+    )
+    if _matchers_cache is not None and _matchers_cache[0] == key:
+        return _matchers_cache[1]
+
+    by_target: Dict[str, List[RegexRule]] = {}
+    for rule in rules_cfg.rules:
+        target = getattr(rule.target, "value", rule.target)  # enum or str
+        by_target.setdefault(target, []).append(rule)
+    matchers = {target: _TargetMatcher(rules) for target, rules in by_target.items()}
+    _matchers_cache = (key, matchers)
+    return matchers
+
 
 def apply_rules(snapshot: Dict[str, Any], rules_cfg: RulesConfig) -> List[Dict[str, Any]]:
     findings: List[Dict[str, Any]] = []
+    matchers = _matchers_for(rules_cfg)
     for chk in snapshot.get("checks", []):
         chk_name = chk.get("name")
-        for rule in rules_cfg.rules:
-            target = getattr(rule.target, "value", rule.target)  # enum or str
-            blob = _blob_for(chk, target)
+        # Build all three blobs once per check instead of per matcher lookup
+        http = chk.get("http") or {}
+        status = http.get("status")
+        blobs = {
+            "headers": http.get("headers"),
+            "status": str(status) if status is not None else None,
+            "body": http.get("body_snippet"),
+        }
+        for target, matcher in matchers.items():
+            blob = blobs.get(target)
             if not blob:
                 continue
-            try:
-                rx = re.compile(rule.pattern)  # inline flags (?i)(?m)(?s) supported
-            except re.error as e:
-                findings.append({
-                    "rule_id": getattr(rule, "id", "<invalid-regex>"),
-                    "check": chk_name,
-                    "severity": "warning",
-                    "advice": f"Invalid regex in rules.yaml: {e}",
-                    "evidence": None,
-                })
-                continue
-            m = rx.search(blob)
-            if m:
-                findings.append({
-                    "rule_id": rule.id,
-                    "check": chk_name,
-                    "severity": getattr(rule.severity, "value", rule.severity),
-                    "advice": rule.advice,
-                    "evidence": blob[m.start():m.end()][:160],
-                })
-    return findings
\ No newline at end of file
+            matcher.match_into(blob, chk_name, findings)
+    return findings
@@ -1,5 +1,7 @@
+import os
+from collections import OrderedDict
 from pathlib import Path
-from typing import Type, TypeVar, Tuple
+from typing import Any, Tuple, Type, TypeVar
 import yaml
 from pydantic import ValidationError
 
@@ -7,6 +9,14 @@ T = TypeVar("T")
 
 CONFIG_DIR = Path(__file__).resolve().parent.parent / "configs"
 
+# Validated-config cache: path -> (st_mtime_ns, st_size, model instance).
+# Caching the *validated* model (not the raw dict) lets repeat requests skip
+# both yaml.safe_load and model_validate. LRU-evicted, capped so a pathological
+# caller can't grow it without bound.
+_CACHE_MAX = 100
+_config_cache: "OrderedDict[Path, Tuple[int, int, Any]]" = OrderedDict()
+
+
 def load_yaml_raw(rel_path: str) -> Tuple[dict, Path]:
     path = CONFIG_DIR / rel_path
     if not path.exists():
@@ -16,10 +26,42 @@ def load_yaml_raw(rel_path: str) -> Tuple[dict, Path]:
     return data, path
 
 
-def load_and_validate(rel_path: str, model: Type[T]) -> T:
+def _load_validated(rel_path: str, model: Type[T]) -> Tuple[T, "os.stat_result"]:
+    path = CONFIG_DIR / rel_path
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        _config_cache.pop(path, None)
+        raise FileNotFoundError(f"Config not found: {path}")
+
+    cached = _config_cache.get(path)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        _config_cache.move_to_end(path)  # refresh LRU position
+        return cached[2], st
+
     data, path = load_yaml_raw(rel_path)
     try:
-        return model.model_validate(data)  # Pydantic v2 method
+        validated = model.model_validate(data)  # Pydantic v2 method
     except ValidationError as e:
         # Add file path context so errors are easy to read
-        raise ValueError(f"Invalid config in {path}:\n{e}") from e
\ No newline at end of file
+        raise ValueError(f"Invalid config in {path}:\n{e}") from e
+
+    _config_cache[path] = (st.st_mtime_ns, st.st_size, validated)
+    _config_cache.move_to_end(path)
+    while len(_config_cache) > _CACHE_MAX:
+        _config_cache.popitem(last=False)
+    return validated, st
+
+
+def load_and_validate(rel_path: str, model: Type[T]) -> T:
+    return _load_validated(rel_path, model)[0]
+
+
+def load_and_validate_with_etag(rel_path: str, model: Type[T]) -> Tuple[T, str]:
+    """
+    Like load_and_validate, but also return a strong ETag derived from the
+    same stat the cache uses, so endpoints can answer If-None-Match with a
+    bodyless 304.
+    """
+    validated, st = _load_validated(rel_path, model)
+    return validated, f'"{st.st_mtime_ns}-{st.st_size}"'